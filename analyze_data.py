@@ -4,153 +4,286 @@ Assessment Data Analyzer
 Analyzes response timing and cursor movement data from personality assessments
 """
 
-import json
-import statistics
+import heapq
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Tuple
 import sys
 
+import numpy as np
+import orjson
+
+from fast_stats import group_stats, median_f64, std_f64
+
 DATA_DIR = Path("assessment_data")
+# Per-file summaries from the previous run: {file name: [mtime_ns, size, summary]}.
+# Not *.json, so the listing glob never picks it up as an assessment.
+CACHE_FILE = DATA_DIR / ".assessment_summaries.cache"
+
+SummaryCache = Dict[str, Tuple[Tuple[int, int], Dict]]
+
+def _listing() -> List[Path]:
+    """Return the assessment JSON files"""
+    return list(DATA_DIR.glob("*.json"))
+
+def _summarize_assessment(assessment: Dict) -> Dict:
+    """Project an assessment down to the fields the analyzers read, dropping raw cursor paths"""
+    summary = {k: assessment[k] for k in ('user_id', 'user_name', 'answered_questions', 'total_questions')
+               if k in assessment}
+    summary['response_timings'] = {
+        q_id: {'response_time_seconds': timing['response_time_seconds']}
+        for q_id, timing in assessment.get('response_timings', {}).items()
+    }
+    summary['cursor_movements'] = {
+        q_id: {'total_movements': movement_data.get('total_movements', 0)}
+        for q_id, movement_data in assessment.get('cursor_movements', {}).items()
+    }
+    analytics = assessment.get('analytics', {})
+    summary['analytics'] = {k: analytics[k] for k in ('total_time_minutes', 'average_time_per_question_seconds')
+                            if k in analytics}
+    cursor_stats = assessment.get('cursor_statistics', {})
+    summary['cursor_statistics'] = {k: cursor_stats[k]
+                                    for k in ('total_movements_all_questions', 'average_movements_per_question')
+                                    if k in cursor_stats}
+    return summary
+
+def _read_cache() -> SummaryCache:
+    """Load the persisted summaries; a missing or unreadable sidecar just means a cold run"""
+    try:
+        raw = orjson.loads(CACHE_FILE.read_bytes())
+        return {name: ((mtime, size), summary) for name, (mtime, size, summary) in raw.items()
+                if isinstance(summary, dict)}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+def _write_cache(entries: SummaryCache):
+    """Persist the summaries atomically, so a crash mid-write never leaves a torn sidecar"""
+    tmp = CACHE_FILE.with_name(CACHE_FILE.name + ".tmp")
+    try:
+        tmp.write_bytes(orjson.dumps({name: [*key, summary] for name, (key, summary) in entries.items()}))
+        tmp.replace(CACHE_FILE)
+    except OSError as e:
+        print(f"Warning: could not write {CACHE_FILE}: {e}")
+
+def _load_summary(file: Path, cache: SummaryCache) -> Tuple[Tuple[int, int], Dict]:
+    """Stat and summarize one assessment file, serving it from cache when unchanged"""
+    st = file.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = cache.get(file.name)
+    if cached is not None and cached[0] == key:
+        return key, cached[1]
+    return key, _summarize_assessment(orjson.loads(file.read_bytes()))
+
+def _load_full(file: Path) -> Dict:
+    """Parse one assessment file in full"""
+    return orjson.loads(file.read_bytes())
+
+def _try_load(load: Callable[[Path], Any], file: Path):
+    """Run a loader on a worker thread, handing any error back to the caller"""
+    try:
+        return load(file), None
+    except Exception as e:
+        return None, e
+
+def _iter_loaded(files: List[Path], load: Callable[[Path], Any]) -> Iterator[Tuple[Path, Any]]:
+    """Yield (file, loaded) in listing order, keeping only a small window of reads in flight"""
+    workers = min(32, len(files) or 1)
+    remaining = iter(files)
+    # Reads release the GIL, so a thread pool overlaps the per-file I/O latency;
+    # the bounded window keeps parsed-but-unconsumed files from piling up
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque((file, executor.submit(_try_load, load, file))
+                        for file in islice(remaining, 2 * workers))
+        while pending:
+            file, future = pending.popleft()
+            for nxt in islice(remaining, 1):
+                pending.append((nxt, executor.submit(_try_load, load, nxt)))
+            loaded, error = future.result()
+            if error is not None:
+                print(f"Error loading {file}: {error}")
+                continue
+            yield file, loaded
+
+def iter_assessments() -> Iterator[Dict]:
+    """Yield per-file assessment summaries, reusing cached summaries of unchanged files"""
+    if not DATA_DIR.exists():
+        print(f"Error: {DATA_DIR} directory not found")
+        return
+    
+    cache = _read_cache()
+    live_entries = {}
+    for file, (key, summary) in _iter_loaded(_listing(), lambda f: _load_summary(f, cache)):
+        live_entries[file.name] = (key, summary)
+        yield summary
+    
+    # Rewrite only when files were added, changed or deleted; cache hits are
+    # the same objects, so this comparison is an identity check per entry
+    if live_entries != cache:
+        _write_cache(live_entries)
 
 def load_all_assessments() -> List[Dict]:
     """Load all assessment JSON files"""
-    assessments = []
     if not DATA_DIR.exists():
         print(f"Error: {DATA_DIR} directory not found")
-        return assessments
-    
-    for file in DATA_DIR.glob("*.json"):
-        try:
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                assessments.append(data)
-        except Exception as e:
-            print(f"Error loading {file}: {e}")
+        return []
     
-    return assessments
+    return [data for _, data in _iter_loaded(_listing(), _load_full)]
 
 def analyze_response_times(assessments: List[Dict]) -> Dict[str, Any]:
     """Analyze response time patterns"""
-    all_times = []
-    question_times = {}
+    times, codes = array('d'), array('q')
+    question_codes = {}
     
     for assessment in assessments:
-        timings = assessment.get('response_timings', {})
-        for q_id, timing in timings.items():
-            time_seconds = float(timing['response_time_seconds'])
-            all_times.append(time_seconds)
-            
-            if q_id not in question_times:
-                question_times[q_id] = []
-            question_times[q_id].append(time_seconds)
+        _collect_response_times(assessment, times, codes, question_codes)
     
-    if not all_times:
+    return _summarize_response_times(_as_float_array(times), _as_code_array(codes), question_codes)
+
+def _collect_response_times(assessment: Dict, times: array, codes: array,
+                            question_codes: Dict[str, int]):
+    """Append one assessment's response times and their question codes to the typed buffers"""
+    timings = assessment.get('response_timings', {})
+    times.extend(float(timing['response_time_seconds']) for timing in timings.values())
+    codes.extend(question_codes.setdefault(q_id, len(question_codes)) for q_id in timings)
+
+def _as_float_array(buffer: array) -> np.ndarray:
+    """Zero-copy float64 view of a typed buffer"""
+    return np.frombuffer(buffer, dtype=np.float64)
+
+def _as_code_array(buffer: array) -> np.ndarray:
+    """Zero-copy int64 view of a typed buffer, as intp codes for bincount/indexing"""
+    return np.frombuffer(buffer, dtype=np.int64).astype(np.intp, copy=False)
+
+def _summarize_response_times(all_times: np.ndarray, codes: np.ndarray,
+                              question_codes: Dict[str, int]) -> Dict[str, Any]:
+    """Per-question and overall timing stats from flattened times and question codes"""
+    if not all_times.size:
         return {}
     
+    grouped = group_stats(all_times, codes, len(question_codes))
+    
     # Calculate question difficulty (average time)
     question_difficulty = {}
-    for q_id, times in question_times.items():
+    for q_id, code in question_codes.items():
         question_difficulty[q_id] = {
-            'average_time': round(statistics.mean(times), 2),
-            'median_time': round(statistics.median(times), 2),
-            'std_dev': round(statistics.stdev(times), 2) if len(times) > 1 else 0,
-            'min_time': round(min(times), 2),
-            'max_time': round(max(times), 2),
-            'sample_size': len(times)
+            'average_time': round(float(grouped['mean'][code]), 2),
+            'median_time': round(float(grouped['median'][code]), 2),
+            'std_dev': round(float(grouped['std_dev'][code]), 2),
+            'min_time': round(float(grouped['min'][code]), 2),
+            'max_time': round(float(grouped['max'][code]), 2),
+            'sample_size': int(grouped['count'][code])
         }
     
     # Sort questions by difficulty (longest avg time)
-    sorted_questions = sorted(
+    sorted_questions = heapq.nlargest(
+        10,
         question_difficulty.items(),
-        key=lambda x: x[1]['average_time'],
-        reverse=True
+        key=lambda x: x[1]['average_time']
     )
     
     return {
         'overall': {
-            'total_responses': len(all_times),
-            'average_time': round(statistics.mean(all_times), 2),
-            'median_time': round(statistics.median(all_times), 2),
-            'std_dev': round(statistics.stdev(all_times), 2) if len(all_times) > 1 else 0,
-            'min_time': round(min(all_times), 2),
-            'max_time': round(max(all_times), 2)
+            'total_responses': int(all_times.size),
+            'average_time': round(float(all_times.mean()), 2),
+            'median_time': round(median_f64(all_times), 2),
+            'std_dev': round(std_f64(all_times), 2),
+            'min_time': round(float(all_times.min()), 2),
+            'max_time': round(float(all_times.max()), 2)
         },
         'by_question': dict(question_difficulty),
         'difficulty_ranking': [
             {'question_id': q[0], **q[1]} 
-            for q in sorted_questions[:10]  # Top 10 hardest
+            for q in sorted_questions  # Top 10 hardest
         ]
     }
 
 def analyze_cursor_movements(assessments: List[Dict]) -> Dict[str, Any]:
     """Analyze cursor movement patterns"""
-    all_movements = []
     question_movements = {}
     
     for assessment in assessments:
-        cursor_data = assessment.get('cursor_movements', {})
-        for q_id, movement_data in cursor_data.items():
-            movement_count = movement_data.get('total_movements', 0)
-            all_movements.append(movement_count)
-            
-            if q_id not in question_movements:
-                question_movements[q_id] = []
-            question_movements[q_id].append(movement_count)
+        _collect_cursor_movements(assessment, question_movements)
     
-    if not all_movements:
+    return _summarize_cursor_movements(question_movements)
+
+def _collect_cursor_movements(assessment: Dict, question_movements: Dict[str, List[int]]):
+    """Append one assessment's per-question movement counts to the accumulators"""
+    cursor_data = assessment.get('cursor_movements', {})
+    for q_id, movement_data in cursor_data.items():
+        movement_count = movement_data.get('total_movements', 0)
+        
+        if q_id not in question_movements:
+            question_movements[q_id] = []
+        question_movements[q_id].append(movement_count)
+
+def _summarize_cursor_movements(question_movements: Dict[str, List[int]]) -> Dict[str, Any]:
+    """Per-question and overall movement stats from collected counts"""
+    if not question_movements:
         return {}
     
     # Calculate question engagement (average cursor activity)
+    counts = np.fromiter((len(m) for m in question_movements.values()), dtype=np.intp,
+                         count=len(question_movements))
+    values = np.fromiter((c for m in question_movements.values() for c in m), dtype=np.float64,
+                         count=int(counts.sum()))
+    codes = np.repeat(np.arange(len(question_movements)), counts)
+    grouped = group_stats(values, codes, len(question_movements))
+    
     question_engagement = {}
-    for q_id, movements in question_movements.items():
+    for code, q_id in enumerate(question_movements):
         question_engagement[q_id] = {
-            'average_movements': round(statistics.mean(movements), 2),
-            'median_movements': round(statistics.median(movements), 2),
-            'std_dev': round(statistics.stdev(movements), 2) if len(movements) > 1 else 0,
-            'sample_size': len(movements)
+            'average_movements': round(float(grouped['mean'][code]), 2),
+            'median_movements': round(float(grouped['median'][code]), 2),
+            'std_dev': round(float(grouped['std_dev'][code]), 2),
+            'sample_size': int(grouped['count'][code])
         }
     
     # Sort questions by engagement (most cursor activity)
-    sorted_engagement = sorted(
+    sorted_engagement = heapq.nlargest(
+        10,
         question_engagement.items(),
-        key=lambda x: x[1]['average_movements'],
-        reverse=True
+        key=lambda x: x[1]['average_movements']
     )
     
     return {
         'overall': {
-            'total_tracked': len(all_movements),
-            'average_movements': round(statistics.mean(all_movements), 2),
-            'median_movements': round(statistics.median(all_movements), 2),
-            'std_dev': round(statistics.stdev(all_movements), 2) if len(all_movements) > 1 else 0
+            'total_tracked': int(values.size),
+            'average_movements': round(float(values.mean()), 2),
+            'median_movements': round(median_f64(values), 2),
+            'std_dev': round(std_f64(values), 2)
         },
         'by_question': dict(question_engagement),
         'engagement_ranking': [
             {'question_id': q[0], **q[1]} 
-            for q in sorted_engagement[:10]  # Top 10 most engaging
+            for q in sorted_engagement  # Top 10 most engaging
         ]
     }
 
 def analyze_user_patterns(assessments: List[Dict]) -> Dict[str, Any]:
     """Analyze individual user patterns"""
-    users = []
-    
-    for assessment in assessments:
-        analytics = assessment.get('analytics', {})
-        cursor_stats = assessment.get('cursor_statistics', {})
-        
-        user_pattern = {
-            'user_id': assessment.get('user_id'),
-            'user_name': assessment.get('user_name'),
-            'total_time_minutes': float(analytics.get('total_time_minutes', 0)),
-            'avg_time_per_question': float(analytics.get('average_time_per_question_seconds', 0)),
-            'total_cursor_movements': cursor_stats.get('total_movements_all_questions', 0),
-            'avg_movements_per_question': cursor_stats.get('average_movements_per_question', 0),
-            'completion_rate': assessment.get('answered_questions', 0) / assessment.get('total_questions', 1)
-        }
-        users.append(user_pattern)
+    return _summarize_user_patterns([_user_pattern(a) for a in assessments])
+
+def _user_pattern(assessment: Dict) -> Dict[str, Any]:
+    """Extract the per-user timing and cursor summary from one assessment"""
+    analytics = assessment.get('analytics', {})
+    cursor_stats = assessment.get('cursor_statistics', {})
     
+    return {
+        'user_id': assessment.get('user_id'),
+        'user_name': assessment.get('user_name'),
+        'total_time_minutes': float(analytics.get('total_time_minutes', 0)),
+        'avg_time_per_question': float(analytics.get('average_time_per_question_seconds', 0)),
+        'total_cursor_movements': cursor_stats.get('total_movements_all_questions', 0),
+        'avg_movements_per_question': cursor_stats.get('average_movements_per_question', 0),
+        'completion_rate': assessment.get('answered_questions', 0) / assessment.get('total_questions', 1)
+    }
+
+def _summarize_user_patterns(users: List[Dict]) -> Dict[str, Any]:
+    """Categorize users by speed and cursor activity"""
     if not users:
         return {}
     
@@ -159,12 +292,12 @@ def analyze_user_patterns(assessments: List[Dict]) -> Dict[str, Any]:
     avg_movements = [u['avg_movements_per_question'] for u in users if u['avg_movements_per_question'] > 0]
     
     if avg_times:
-        time_threshold = statistics.median(avg_times)
+        time_threshold = median_f64(avg_times)
     else:
         time_threshold = 0
         
     if avg_movements:
-        movement_threshold = statistics.median(avg_movements)
+        movement_threshold = median_f64(avg_movements)
     else:
         movement_threshold = 0
     
@@ -221,6 +354,27 @@ def analyze_user_patterns(assessments: List[Dict]) -> Dict[str, Any]:
         }
     }
 
+def analyze_all(assessments: Iterable[Dict]) -> Dict[str, Any]:
+    """Run all three analyses in a single pass over the assessments"""
+    times, codes = array('d'), array('q')
+    question_codes = {}
+    question_movements = {}
+    users = []
+    
+    for assessment in assessments:
+        _collect_response_times(assessment, times, codes, question_codes)
+        _collect_cursor_movements(assessment, question_movements)
+        users.append(_user_pattern(assessment))
+    
+    return {
+        'total_assessments': len(users),
+        'response_times': _summarize_response_times(
+            _as_float_array(times), _as_code_array(codes), question_codes
+        ),
+        'cursor_movements': _summarize_cursor_movements(question_movements),
+        'user_patterns': _summarize_user_patterns(users)
+    }
+
 def generate_report():
     """Generate comprehensive analysis report"""
     print("=" * 70)
@@ -228,22 +382,22 @@ def generate_report():
     print("=" * 70)
     print()
     
-    # Load data
+    # Stream per-file summaries into one analysis pass
     print("Loading assessment data...")
-    assessments = load_all_assessments()
+    results = analyze_all(iter_assessments())
     
-    if not assessments:
+    if not results['total_assessments']:
         print("No assessment data found!")
         return
     
-    print(f"Loaded {len(assessments)} assessments")
+    print(f"Loaded {results['total_assessments']} assessments")
     print()
     
     # Response Time Analysis
     print("-" * 70)
     print("RESPONSE TIME ANALYSIS")
     print("-" * 70)
-    time_analysis = analyze_response_times(assessments)
+    time_analysis = results['response_times']
     if time_analysis:
         overall = time_analysis['overall']
         print(f"Total responses analyzed: {overall['total_responses']}")
@@ -260,7 +414,7 @@ def generate_report():
     print("-" * 70)
     print("CURSOR MOVEMENT ANALYSIS")
     print("-" * 70)
-    cursor_analysis = analyze_cursor_movements(assessments)
+    cursor_analysis = results['cursor_movements']
     if cursor_analysis:
         overall = cursor_analysis['overall']
         print(f"Total questions tracked: {overall['total_tracked']}")
@@ -276,7 +430,7 @@ def generate_report():
     print("-" * 70)
     print("USER BEHAVIOR PATTERNS")
     print("-" * 70)
-    user_patterns = analyze_user_patterns(assessments)
+    user_patterns = results['user_patterns']
     if user_patterns:
         print(f"Total users analyzed: {user_patterns['total_users']}")
         print()
@@ -0,0 +1,61 @@
+"""
+Fast Statistics
+NumPy-backed replacements for the statistics module used by the analyzers
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+def median_f64(values) -> float:
+    """Median via partition-based selection (introselect) instead of a full sort"""
+    a = np.asarray(values, dtype=np.float64)
+    n = a.size
+    if n == 0:
+        raise ValueError("no median for empty data")
+
+    mid = n // 2
+    if n % 2:
+        return float(np.partition(a, mid)[mid])
+
+    part = np.partition(a, (mid - 1, mid))
+    return float((part[mid - 1] + part[mid]) / 2)
+
+def group_mean_std(values: np.ndarray, codes: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group mean and sample stdev from grouped sums of values and centred squares"""
+    values = np.asarray(values, dtype=np.float64)
+    n = np.bincount(codes, minlength=n_groups)
+    s = np.bincount(codes, weights=values, minlength=n_groups)
+
+    # Clamp denominators instead of branching so empty/singleton groups need no special case
+    means = s / np.maximum(n, 1)
+    # Centre before squaring: sum(x^2) - n*mean^2 cancels catastrophically
+    # when values are large relative to their spread
+    d = values - means[codes]
+    ss = np.bincount(codes, weights=d * d, minlength=n_groups)
+    var = np.where(n > 1, ss / np.maximum(n - 1, 1), 0.0)
+    std_devs = np.sqrt(np.maximum(var, 0.0))
+    return means, std_devs
+
+def std_f64(values) -> float:
+    """Sample stdev of a whole array; 0.0 for fewer than two values"""
+    a = np.asarray(values, dtype=np.float64)
+    return float(a.std(ddof=1)) if a.size > 1 else 0.0
+
+def group_stats(values: np.ndarray, codes: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """Per-group mean/median/stdev/min/max for values labelled with dense group codes"""
+    means, std_devs = group_mean_std(values, codes, n_groups)
+
+    # Sort by group, then by value, so every group is a contiguous sorted run
+    sorted_values = values[np.lexsort((values, codes))]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    return {
+        'mean': means,
+        'median': (sorted_values[starts + (counts - 1) // 2] + sorted_values[starts + counts // 2]) / 2,
+        'std_dev': std_devs,
+        'min': sorted_values[starts],
+        'max': sorted_values[starts + counts - 1],
+        'count': counts
+    }